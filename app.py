@@ -1,32 +1,66 @@
 # backend/app.py
-from flask import Flask, request, session, Response, redirect
+from dotenv import load_dotenv
+from utils.logging_config import setup_logging
+
+# Carregar o .env e configurar os logs antes dos imports locais: os serviços
+# leem a configuração ao importar
+load_dotenv()
+setup_logging()
+
+from flask import Flask, request, session, Response, redirect, make_response
 from flask_cors import CORS
 from flask_restx import Api, Resource, fields
 from extensions import db, bcrypt, limiter
 from models import Host, Event, Attendee
 from email_validator import validate_email, EmailNotValidError
 from services.email_service import (
+    dispatch_notification,
     send_rsvp_notification,
     send_modification_notification,
     send_cancellation_notification,
 )
 from services.geocoding_service import geocode_address
 from datetime import datetime
-from dotenv import load_dotenv
-from sqlalchemy.exc import SQLAlchemyError
+from jsonschema import Draft4Validator
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
 import os
+import sys
 import csv
 import io
-
-load_dotenv()
+import orjson
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
-app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
+database_url = os.getenv("DATABASE_URL")
+app.config["SQLALCHEMY_DATABASE_URI"] = database_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Pool de conexões: pre_ping descarta conexões mortas antes do uso e
+# pool_recycle evita reaproveitar conexões encerradas pelo servidor
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+}
+if database_url and not database_url.startswith("sqlite"):
+    # Cada worker do Gunicorn tem até 8 threads de requisição + 4 threads de
+    # envio de emails, cada uma com a sua conexão
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    )
+if database_url and database_url.startswith("postgres"):
+    # Identifica as conexões da aplicação em pg_stat_activity
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"]["connect_args"] = {
+        "application_name": "rsvp_app"
+    }
+# Custo do bcrypt (padrão do Flask-Bcrypt é 12, ~300 ms por verificação)
+app.config["BCRYPT_LOG_ROUNDS"] = int(os.getenv("BCRYPT_LOG_ROUNDS", "10"))
 
 db.init_app(app)
 bcrypt.init_app(app)
+# Hash fictício (mesmo custo dos reais) verificado no login quando o email não existe
+_DUMMY_PASSWORD_HASH = bcrypt.generate_password_hash(os.urandom(16).hex()).decode("utf-8")
 limiter.init_app(app)
 CORS(app, supports_credentials=True, origins=[os.getenv("FRONTEND_URL", "http://localhost:3000")])
 
@@ -40,6 +74,18 @@ api = Api(
     catch_all_404s=False,
 )
 
+
+@api.representation("application/json")
+def output_json(data, code, headers=None):
+    """Serializar respostas JSON com orjson (datas e datetimes em ISO 8601)"""
+    options = orjson.OPT_NON_STR_KEYS
+    if app.debug:
+        options |= orjson.OPT_INDENT_2
+    resp = make_response(orjson.dumps(data, option=options), code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
 # Namespaces (grupos de endpoints)
 auth_ns = api.namespace(
     "auth", description="Operações de autenticação", path="/api/auth"
@@ -74,10 +120,16 @@ login_model = api.model(
     "Login",
     {
         "email": fields.String(
-            required=True, description="Email do anfitrião", example="anfitriao@exemplo.com"
+            required=True,
+            min_length=1,
+            description="Email do anfitrião",
+            example="anfitriao@exemplo.com",
         ),
         "password": fields.String(
-            required=True, description="Senha", example="senhaSegura123"
+            required=True,
+            min_length=1,
+            description="Senha",
+            example="senhaSegura123",
         ),
     },
 )
@@ -172,21 +224,38 @@ rsvp_model = api.model(
     },
 )
 
-rsvp_update_model = api.model(
-    "RSVPUpdate",
+bulk_attendee_model = api.model(
+    "BulkAttendee",
     {
         "whatsapp_number": fields.String(
             required=True,
-            description="WhatsApp do convidado para identificação",
+            min_length=1,
+            description="WhatsApp do convidado",
             example="5521988888888",
         ),
-        "name": fields.String(description="Nome atualizado", example="Maria Silva"),
-        "num_adults": fields.Integer(description="Número atualizado de adultos", example=3),
-        "num_children": fields.Integer(
-            description="Número atualizado de crianças", example=2
+        "name": fields.String(
+            required=True, description="Nome do convidado", example="Maria Silva"
         ),
-        "comments": fields.String(
-            description="Comentários atualizados", example="Agora preciso de refeição vegana"
+        "num_adults": fields.Integer(
+            required=True, description="Número de adultos", example=2
+        ),
+        "num_children": fields.Integer(description="Número de crianças", example=1),
+        "comments": fields.String(description="Comentários", example="Vegetariano"),
+    },
+)
+
+rsvp_bulk_model = api.model(
+    "RSVPBulk",
+    {
+        "event_slug": fields.String(
+            required=True, min_length=1, description="Slug do evento", example="abc123"
+        ),
+        "attendees": fields.List(
+            fields.Nested(bulk_attendee_model),
+            required=True,
+            min_items=1,
+            max_items=1000,
+            description="Convidados a importar",
         ),
     },
 )
@@ -195,10 +264,16 @@ rsvp_cancel_model = api.model(
     "RSVPCancel",
     {
         "event_slug": fields.String(
-            required=True, description="Slug do evento", example="festa-aniversario-abc123"
+            required=True,
+            min_length=1,
+            description="Slug do evento",
+            example="festa-aniversario-abc123",
         ),
         "whatsapp_number": fields.String(
-            required=True, description="WhatsApp do convidado", example="5521988888888"
+            required=True,
+            min_length=1,
+            description="WhatsApp do convidado",
+            example="5521988888888",
         ),
         "reason": fields.String(
             description="Motivo do cancelamento", example="Não poderei comparecer devido a um conflito"
@@ -220,10 +295,16 @@ attendee_find_model = api.model(
     "AttendeeFind",
     {
         "event_slug": fields.String(
-            required=True, description="Slug do evento", example="festa-aniversario-abc123"
+            required=True,
+            min_length=1,
+            description="Slug do evento",
+            example="festa-aniversario-abc123",
         ),
         "whatsapp_number": fields.String(
-            required=True, description="Número do WhatsApp", example="5521999999999"
+            required=True,
+            min_length=1,
+            description="Número do WhatsApp",
+            example="5521999999999",
         ),
     },
 )
@@ -231,8 +312,12 @@ attendee_find_model = api.model(
 attendee_modify_model = api.model(
     "AttendeeModify",
     {
-        "event_slug": fields.String(required=True, description="Slug do evento"),
-        "whatsapp_number": fields.String(required=True, description="Número do WhatsApp"),
+        "event_slug": fields.String(
+            required=True, min_length=1, description="Slug do evento"
+        ),
+        "whatsapp_number": fields.String(
+            required=True, min_length=1, description="Número do WhatsApp"
+        ),
         "name": fields.String(description="Novo nome"),
         "num_adults": fields.Integer(description="Novo número de adultos"),
         "num_children": fields.Integer(description="Novo número de crianças"),
@@ -240,6 +325,62 @@ attendee_modify_model = api.model(
     },
 )
 
+# Campos de texto livre que podem ser enviados como null (colunas anuláveis);
+# nome e números de convidados continuam obrigatoriamente preenchidos
+_NULLABLE_FIELDS = {"comments", "reason"}
+
+
+def _allow_null(schema):
+    """Aceitar null nos campos opcionais anuláveis do schema"""
+    properties = {
+        name: (
+            {**prop, "type": [prop["type"], "null"]}
+            if name in _NULLABLE_FIELDS and "type" in prop
+            else prop
+        )
+        for name, prop in schema.get("properties", {}).items()
+    }
+    return {**schema, "properties": properties}
+
+
+# Validadores JSON Schema compilados uma única vez a partir dos models acima
+_schema_definitions = {
+    name: _allow_null(model.__schema__) for name, model in api.models.items()
+}
+_payload_validators = {
+    model.name: Draft4Validator(
+        {**_schema_definitions[model.name], "definitions": _schema_definitions}
+    )
+    for model in (
+        signup_model,
+        login_model,
+        rsvp_model,
+        rsvp_bulk_model,
+        attendee_find_model,
+        attendee_modify_model,
+        rsvp_cancel_model,
+    )
+}
+
+
+def _is_missing_field_error(error):
+    # Campo ausente ou vazio é tratado como "obrigatório não preenchido"; os
+    # demais erros (tipo, null em campo não anulável...) indicam dado inválido
+    return error.validator in ("required", "minLength", "minItems")
+
+
+def _validated_payload(model, message):
+    """Obter o corpo JSON da requisição validado contra o schema do model"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        api.abort(400, message)
+    errors = list(_payload_validators[model.name].iter_errors(data))
+    if any(_is_missing_field_error(error) for error in errors):
+        api.abort(400, message)
+    if errors:
+        api.abort(400, "Dados inválidos. Verifique os valores enviados")
+    return data
+
 
 # ============= AUTH ROUTES =============
 @auth_ns.route("/signup")
@@ -250,10 +391,10 @@ class Signup(Resource):
     @auth_ns.response(409, "Email já cadastrado")
     def post(self):
         """Criar nova conta de anfitrião"""
-        data = request.get_json()
-        required = ["email", "password", "name", "whatsapp_number"]
-        if not all(field in data for field in required):
-            api.abort(400, "Preencha todos os campos obrigatórios: email, senha, nome e WhatsApp")
+        data = _validated_payload(
+            signup_model,
+            "Preencha todos os campos obrigatórios: email, senha, nome e WhatsApp",
+        )
 
         try:
             email_info = validate_email(data["email"], check_deliverability=False)
@@ -261,7 +402,7 @@ class Signup(Resource):
         except EmailNotValidError:
             api.abort(400, "Email inválido. Verifique o formato (exemplo@dominio.com)")
 
-        if Host.query.filter_by(email=email).first():
+        if db.session.scalar(select(Host.id).where(Host.email == email)):
             api.abort(409, "Este email já está cadastrado. Faça login ou use outro email")
 
         password_hash = bcrypt.generate_password_hash(data["password"]).decode("utf-8")
@@ -294,16 +435,23 @@ class Login(Resource):
     @auth_ns.response(401, "Credenciais inválidas")
     def post(self):
         """Fazer login como anfitrião"""
-        data = request.get_json()
-        if not data.get("email") or not data.get("password"):
-            api.abort(400, "Email e senha são obrigatórios")
-
-        host = Host.query.filter_by(email=data["email"]).first()
-        if not host or not bcrypt.check_password_hash(
-            host.password_hash, data["password"]
-        ):
+        data = _validated_payload(login_model, "Email e senha são obrigatórios")
+
+        host = db.session.scalar(select(Host).where(Host.email == data["email"]))
+        # Sempre verificar um hash, para que o tempo de resposta não revele
+        # se o email está cadastrado
+        password_hash = host.password_hash if host else _DUMMY_PASSWORD_HASH
+        password_ok = bcrypt.check_password_hash(password_hash, data["password"])
+        if not host or not password_ok:
             api.abort(401, "Email ou senha incorretos")
 
+        # Regerar hash criado com outro custo (ex.: contas antigas com 12 rounds)
+        if int(host.password_hash.split("$")[2]) != app.config["BCRYPT_LOG_ROUNDS"]:
+            host.password_hash = bcrypt.generate_password_hash(
+                data["password"]
+            ).decode("utf-8")
+            db.session.commit()
+
         session["host_id"] = host.id
         return {
             "message": "Login successful",
@@ -334,7 +482,7 @@ class CurrentHost(Resource):
         if "host_id" not in session:
             api.abort(401, "Você precisa fazer login para acessar esta página")
 
-        host = Host.query.get(session["host_id"])
+        host = db.session.get(Host, session["host_id"])
         if not host:
             api.abort(404, "Usuário não encontrado. Faça login novamente")
 
@@ -426,11 +574,12 @@ class MyEvents(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para ver seus eventos")
 
-        events = (
-            Event.query.filter_by(host_id=session["host_id"])
+        events = db.session.scalars(
+            select(Event)
+            .options(selectinload(Event.attendees))
+            .where(Event.host_id == session["host_id"])
             .order_by(Event.event_date.desc())
-            .all()
-        )
+        ).all()
 
         return {
             "events": [
@@ -439,7 +588,7 @@ class MyEvents(Resource):
                     "slug": event.slug,
                     "title": event.title,
                     "description": event.description,
-                    "event_date": event.event_date.isoformat(),
+                    "event_date": event.event_date,
                     "start_time": event.start_time.strftime("%H:%M"),
                     "end_time": (
                         event.end_time.strftime("%H:%M") if event.end_time else None
@@ -473,7 +622,9 @@ class EventBySlug(Resource):
     @events_ns.response(404, "Evento não encontrado")
     def get(self, slug):
         """Obter detalhes do evento por slug (para convidados visualizando o convite)"""
-        event = Event.query.filter_by(slug=slug).first()
+        event = db.session.scalar(
+            select(Event).options(joinedload(Event.host)).where(Event.slug == slug)
+        )
         if not event:
             api.abort(404, "Convite não encontrado. Verifique o link")
 
@@ -483,7 +634,7 @@ class EventBySlug(Resource):
                 "slug": event.slug,
                 "title": event.title,
                 "description": event.description,
-                "event_date": event.event_date.isoformat(),
+                "event_date": event.event_date,
                 "start_time": event.start_time.strftime("%H:%M"),
                 "end_time": (
                     event.end_time.strftime("%H:%M") if event.end_time else None
@@ -510,14 +661,16 @@ class EventAttendees(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para ver os convidados")
 
-        event = Event.query.get(event_id)
+        event = db.session.get(Event, event_id)
         if not event:
             api.abort(404, "Evento não encontrado")
 
         if event.host_id != session["host_id"]:
             api.abort(403, "Você não tem permissão para acessar este evento")
 
-        attendees = Attendee.query.filter_by(event_id=event_id).all()
+        attendees = db.session.scalars(
+            select(Attendee).where(Attendee.event_id == event_id)
+        ).all()
 
         return {
             "attendees": [
@@ -529,7 +682,7 @@ class EventAttendees(Resource):
                     "num_children": attendee.num_children,
                     "comments": attendee.comments,
                     "status": attendee.status,
-                    "rsvp_date": attendee.rsvp_date.isoformat(),
+                    "rsvp_date": attendee.rsvp_date,
                 }
                 for attendee in attendees
             ]
@@ -548,11 +701,11 @@ class ManageAttendee(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para editar convidados")
 
-        event = Event.query.get(event_id)
+        event = db.session.get(Event, event_id)
         if not event or event.host_id != session["host_id"]:
             api.abort(403, "Você não tem permissão para editar este convidado")
 
-        attendee = Attendee.query.get(attendee_id)
+        attendee = db.session.get(Attendee, attendee_id)
         if not attendee or attendee.event_id != event_id:
             api.abort(404, "Convidado não encontrado")
 
@@ -578,11 +731,11 @@ class ManageAttendee(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para deletar convidados")
 
-        event = Event.query.get(event_id)
+        event = db.session.get(Event, event_id)
         if not event or event.host_id != session["host_id"]:
             api.abort(403, "Você não tem permissão para deletar este convidado")
 
-        attendee = Attendee.query.get(attendee_id)
+        attendee = db.session.get(Attendee, attendee_id)
         if not attendee or attendee.event_id != event_id:
             api.abort(404, "Convidado não encontrado")
 
@@ -601,7 +754,7 @@ class ExportAttendees(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para exportar a lista de convidados")
 
-        event = Event.query.get(event_id)
+        event = db.session.get(Event, event_id)
         if not event or event.host_id != session["host_id"]:
             api.abort(403, "Você não tem permissão para exportar convidados deste evento")
 
@@ -654,7 +807,7 @@ class EventManagement(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para editar eventos")
 
-        event = Event.query.get(event_id)
+        event = db.session.get(Event, event_id)
 
         if not event:
             api.abort(404, "Evento não encontrado")
@@ -723,7 +876,7 @@ class EventManagement(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para deletar eventos")
 
-        event = Event.query.get(event_id)
+        event = db.session.get(Event, event_id)
 
         if not event:
             api.abort(404, "Evento não encontrado")
@@ -733,7 +886,7 @@ class EventManagement(Resource):
 
         try:
             # Deletar todos os convidados primeiro (cascade deve lidar com isso, mas sendo explícito)
-            Attendee.query.filter_by(event_id=event_id).delete()
+            db.session.execute(delete(Attendee).where(Attendee.event_id == event_id))
 
             # Deletar evento
             db.session.delete(event)
@@ -757,7 +910,7 @@ class DuplicateEvent(Resource):
         if "host_id" not in session:
             api.abort(401, "Faça login para duplicar eventos")
 
-        original_event = Event.query.get(event_id)
+        original_event = db.session.get(Event, event_id)
 
         if not original_event:
             api.abort(404, "Evento não encontrado")
@@ -832,6 +985,33 @@ class GeocodeResource(Resource):
 
 
 # ============= ATTENDEE ROUTES =============
+def _find_event_and_attendee(event_slug, whatsapp_number):
+    """Buscar evento e convidado (se houver) em uma única consulta"""
+    stmt = (
+        select(Event, Attendee)
+        .outerjoin(
+            Attendee,
+            (Attendee.event_id == Event.id)
+            & (Attendee.whatsapp_number == whatsapp_number),
+        )
+        .where(Event.slug == event_slug)
+    )
+    row = db.session.execute(stmt).first()
+    return (row.Event, row.Attendee) if row else (None, None)
+
+
+def _attendee_fields(event_id, data):
+    """Colunas de um novo convidado a partir do corpo da requisição"""
+    return {
+        "event_id": event_id,
+        "whatsapp_number": data["whatsapp_number"],
+        "name": data["name"],
+        "num_adults": data["num_adults"],
+        "num_children": data.get("num_children", 0),
+        "comments": data.get("comments", ""),
+    }
+
+
 @attendees_ns.route("/rsvp")
 class RSVPResource(Resource):
     @attendees_ns.expect(rsvp_model)
@@ -841,37 +1021,77 @@ class RSVPResource(Resource):
     @limiter.limit("30 per minute")
     def post(self):
         """Criar confirmação de presença para um evento"""
-        data = request.get_json()
-        required = ["event_slug", "whatsapp_number", "name", "num_adults"]
-        if not all(field in data for field in required):
-            api.abort(400, "Preencha todos os campos obrigatórios: nome, WhatsApp e número de adultos")
+        data = _validated_payload(
+            rsvp_model,
+            "Preencha todos os campos obrigatórios: nome, WhatsApp e número de adultos",
+        )
 
-        event = Event.query.filter_by(slug=data["event_slug"]).first()
+        event, existing = _find_event_and_attendee(
+            data["event_slug"], data["whatsapp_number"]
+        )
         if not event:
             api.abort(404, "Evento não encontrado. Verifique o link do convite")
 
-        existing = Attendee.query.filter_by(
-            event_id=event.id, whatsapp_number=data["whatsapp_number"]
-        ).first()
         if existing:
             api.abort(400, "Você já confirmou presença neste evento")
 
-        attendee = Attendee(
-            event_id=event.id,
-            whatsapp_number=data["whatsapp_number"],
-            name=data["name"],
-            num_adults=data["num_adults"],
-            num_children=data.get("num_children", 0),
-            comments=data.get("comments", ""),
-        )
+        attendee = Attendee(**_attendee_fields(event.id, data))
         db.session.add(attendee)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Outra requisição confirmou o mesmo WhatsApp entre a busca e o insert
+            db.session.rollback()
+            api.abort(400, "Você já confirmou presença neste evento")
 
-        send_rsvp_notification(event, attendee)
+        dispatch_notification(send_rsvp_notification, event.id, attendee.id)
 
         return {"message": "RSVP successful", "attendee_id": attendee.id}, 201
 
 
+@attendees_ns.route("/rsvp/bulk")
+class BulkRSVPResource(Resource):
+    @attendees_ns.expect(rsvp_bulk_model)
+    @attendees_ns.response(201, "Convidados importados com sucesso")
+    @attendees_ns.response(400, "Entrada inválida ou WhatsApp já confirmado")
+    @attendees_ns.response(401, "Não autenticado")
+    @attendees_ns.response(403, "Não autorizado")
+    @attendees_ns.response(404, "Evento não encontrado")
+    def post(self):
+        """Importar uma lista de convidados confirmados (apenas anfitrião)"""
+        if "host_id" not in session:
+            api.abort(401, "Faça login para importar convidados")
+
+        data = _validated_payload(
+            rsvp_bulk_model,
+            "Envie o link do evento e a lista de convidados com nome, WhatsApp e número de adultos",
+        )
+
+        event = db.session.scalar(select(Event).where(Event.slug == data["event_slug"]))
+        if not event:
+            api.abort(404, "Evento não encontrado")
+
+        if event.host_id != session["host_id"]:
+            api.abort(403, "Você não tem permissão para importar convidados neste evento")
+
+        numbers = [item["whatsapp_number"] for item in data["attendees"]]
+        if len(set(numbers)) != len(numbers):
+            api.abort(400, "A lista contém números de WhatsApp repetidos")
+
+        # Um único INSERT em lote (executemany) e um único commit para toda a lista
+        try:
+            db.session.execute(
+                insert(Attendee),
+                [_attendee_fields(event.id, item) for item in data["attendees"]],
+            )
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            api.abort(400, "Algum convidado da lista já confirmou presença neste evento")
+
+        return {"message": "Attendees imported successfully", "created": len(numbers)}, 201
+
+
 @attendees_ns.route("/find")
 class FindAttendee(Resource):
     @attendees_ns.expect(attendee_find_model)
@@ -879,24 +1099,18 @@ class FindAttendee(Resource):
     @attendees_ns.response(404, "Convidado não encontrado")
     def post(self):
         """Buscar convidado por WhatsApp e slug do evento"""
-        data = request.get_json()
-
-        event_slug = data.get("event_slug")
-        whatsapp_number = data.get("whatsapp_number")
+        data = _validated_payload(
+            attendee_find_model, "Link do evento e número de WhatsApp são obrigatórios"
+        )
 
-        if not event_slug or not whatsapp_number:
-            api.abort(400, "Link do evento e número de WhatsApp são obrigatórios")
+        event_slug = data["event_slug"]
+        whatsapp_number = data["whatsapp_number"]
 
-        # Buscar evento
-        event = Event.query.filter_by(slug=event_slug).first()
+        # Buscar evento e convidado
+        event, attendee = _find_event_and_attendee(event_slug, whatsapp_number)
         if not event:
             api.abort(404, "Evento não encontrado. Verifique o link")
 
-        # Buscar convidado
-        attendee = Attendee.query.filter_by(
-            event_id=event.id, whatsapp_number=whatsapp_number
-        ).first()
-
         if not attendee:
             api.abort(404, "Nenhuma confirmação encontrada para este WhatsApp. Verifique o número digitado")
 
@@ -912,7 +1126,7 @@ class FindAttendee(Resource):
             },
             "event": {
                 "title": event.title,
-                "event_date": event.event_date.isoformat(),
+                "event_date": event.event_date,
                 "allow_modifications": bool(event.allow_modifications),
                 "allow_cancellations": bool(event.allow_cancellations),
             },
@@ -927,16 +1141,15 @@ class ModifyRSVP(Resource):
     @attendees_ns.response(404, "Confirmação não encontrada")
     def put(self):
         """Modificar confirmação de presença existente"""
-        data = request.get_json()
-
-        event_slug = data.get("event_slug")
-        whatsapp_number = data.get("whatsapp_number")
+        data = _validated_payload(
+            attendee_modify_model, "Link do evento e número de WhatsApp são obrigatórios"
+        )
 
-        if not event_slug or not whatsapp_number:
-            api.abort(400, "Link do evento e número de WhatsApp são obrigatórios")
+        event_slug = data["event_slug"]
+        whatsapp_number = data["whatsapp_number"]
 
-        # Buscar evento
-        event = Event.query.filter_by(slug=event_slug).first()
+        # Buscar evento e convidado
+        event, attendee = _find_event_and_attendee(event_slug, whatsapp_number)
         if not event:
             api.abort(404, "Evento não encontrado")
 
@@ -944,11 +1157,6 @@ class ModifyRSVP(Resource):
         if not event.allow_modifications:
             api.abort(403, "O anfitrião não permitiu modificações para este evento")
 
-        # Buscar convidado
-        attendee = Attendee.query.filter_by(
-            event_id=event.id, whatsapp_number=whatsapp_number
-        ).first()
-
         if not attendee:
             api.abort(404, "Confirmação não encontrada. Verifique o número de WhatsApp")
 
@@ -967,7 +1175,7 @@ class ModifyRSVP(Resource):
             attendee.status = "confirmed"
 
         db.session.commit()
-        send_modification_notification(event, attendee)
+        dispatch_notification(send_modification_notification, event.id, attendee.id)
 
         return {
             "message": "RSVP updated successfully",
@@ -990,16 +1198,15 @@ class CancelRSVP(Resource):
     @attendees_ns.response(404, "Confirmação não encontrada")
     def post(self):
         """Cancelar confirmação de presença existente"""
-        data = request.get_json()
-
-        event_slug = data.get("event_slug")
-        whatsapp_number = data.get("whatsapp_number")
+        data = _validated_payload(
+            rsvp_cancel_model, "Link do evento e número de WhatsApp são obrigatórios"
+        )
 
-        if not event_slug or not whatsapp_number:
-            api.abort(400, "Link do evento e número de WhatsApp são obrigatórios")
+        event_slug = data["event_slug"]
+        whatsapp_number = data["whatsapp_number"]
 
-        # Buscar evento
-        event = Event.query.filter_by(slug=event_slug).first()
+        # Buscar evento e convidado
+        event, attendee = _find_event_and_attendee(event_slug, whatsapp_number)
         if not event:
             api.abort(404, "Evento não encontrado")
 
@@ -1007,26 +1214,22 @@ class CancelRSVP(Resource):
         if not event.allow_cancellations:
             api.abort(403, "O anfitrião não permitiu cancelamentos para este evento")
 
-        # Buscar convidado
-        attendee = Attendee.query.filter_by(
-            event_id=event.id, whatsapp_number=whatsapp_number
-        ).first()
-
         if not attendee:
             api.abort(404, "Confirmação não encontrada. Verifique o número de WhatsApp")
 
         # Cancelar RSVP
         attendee.status = "cancelled"
         db.session.commit()
-        send_cancellation_notification(event, attendee, data.get("reason", ""))
+        dispatch_notification(
+            send_cancellation_notification,
+            event.id,
+            attendee.id,
+            data.get("reason", ""),
+        )
 
         return {"message": "RSVP cancelled successfully"}, 200
 
 
-# Manter blueprints originais para compatibilidade retroativa
-# Blueprints removidos - todos os endpoints agora usam Flask-RESTX
-
-
 # Redirecionamento raiz - sobrescrever rota raiz do Flask-RESTX
 def redirect_root():
     return redirect("/api/docs")
@@ -1036,7 +1239,16 @@ def redirect_root():
 app.view_functions["root"] = redirect_root
 
 
+with app.app_context():
+    db.create_all()
+
+
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Servidor de desenvolvimento do Flask; em produção use o Gunicorn
+    if os.getenv("FLASK_DEV") == "1":
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        sys.exit(
+            "Use FLASK_DEV=1 para o servidor de desenvolvimento ou rode:\n"
+            "  gunicorn -c gunicorn_conf.py app:app"
+        )
@@ -1,3 +1,5 @@
+import os
+
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_limiter import Limiter
@@ -8,5 +10,7 @@ bcrypt = Bcrypt()
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["10000 per day", "500 per hour"],
-    storage_uri="memory://",
+    # Em memória os contadores são por processo: com vários workers do
+    # Gunicorn, use um armazenamento compartilhado (ex.: redis://host:6379)
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://"),
 )
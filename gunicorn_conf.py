@@ -0,0 +1,53 @@
+# backend/gunicorn_conf.py
+"""
+Configuração do Gunicorn para produção.
+
+Uso: gunicorn -c gunicorn_conf.py app:app
+"""
+import math
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+
+def _available_cpus():
+    """CPUs que o processo pode usar, respeitando o limite do container (cgroup)."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:  # macOS
+        cpus = os.cpu_count() or 1
+    try:
+        # cgroup v2: "<quota> <período>" ou "max <período>" quando não há limite
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# Vários processos x threads: rotas limitadas por I/O (banco, geocodificação,
+# emails) e o bcrypt (que libera o GIL) se sobrepõem
+workers = int(os.getenv("GUNICORN_WORKERS", _available_cpus() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Carrega a aplicação uma única vez no master antes do fork (economiza memória)
+preload_app = True
+
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Conexões abertas no master (db.create_all) não podem ser compartilhadas
+    # entre processos: cada worker abre o seu próprio pool
+    from app import app
+    from extensions import db
+    from utils.logging_config import setup_logging
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # A thread que escreve os logs não sobrevive ao fork
+    setup_logging()
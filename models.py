@@ -23,7 +23,9 @@ class Event(db.Model):
     __tablename__ = "events"
 
     id = db.Column(db.Integer, primary_key=True)
-    host_id = db.Column(db.Integer, db.ForeignKey("hosts.id"), nullable=False)
+    host_id = db.Column(
+        db.Integer, db.ForeignKey("hosts.id"), nullable=False, index=True
+    )
     slug = db.Column(
         db.String(50),
         unique=True,
@@ -77,3 +79,12 @@ class Attendee(db.Model):
             "event_id", "whatsapp_number", name="unique_attendee_per_event"
         ),
     )
+
+
+class GeocodeCache(db.Model):
+    __tablename__ = "geocode_cache"
+
+    address_hash = db.Column(db.LargeBinary(16), primary_key=True)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -5,13 +5,104 @@ Serviço de envio de emails.
 MODO ATUAL: SIMULAÇÃO (Console logs)
 Para produção com SendGrid real, veja instruções no final do arquivo.
 """
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from jinja2 import Environment
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import Event, Attendee
 
 # ============================================================================
 # SENDGRID IMPORTS - Comentado para avaliação (descomente para produção)
 # ============================================================================
 # from sendgrid import SendGridAPIClient
 # from sendgrid.helpers.mail import Mail
+#
+# SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+# if not SENDGRID_API_KEY:
+#     raise RuntimeError("SENDGRID_API_KEY não configurada")
+#
+# Cliente único reaproveitado entre envios (evita novo handshake TLS a cada email)
+# _SG = SendGridAPIClient(SENDGRID_API_KEY)
+
+logger = logging.getLogger(__name__)
+
+SENDER_EMAIL = os.getenv("SENDER_EMAIL", "noreply@venha.app")
+
+# ============================================================================
+# TEMPLATES HTML - Compilados uma vez; autoescape porque nome, comentários e
+# motivo vêm do convidado e iriam direto para a caixa de entrada do anfitrião
+# ============================================================================
+_templates = Environment(autoescape=True)
+
+_RSVP_TEMPLATE = _templates.from_string("""
+<h2>Nova Confirmação de Presença!</h2>
+<p><strong>{{ attendee.name }}</strong> confirmou presença no seu evento: <strong>{{ event.title }}</strong></p>
+
+<h3>Detalhes:</h3>
+<ul>
+    <li>Adultos: {{ attendee.num_adults }}</li>
+    <li>Crianças: {{ attendee.num_children }}</li>
+    <li>WhatsApp: {{ attendee.whatsapp_number }}</li>
+    {% if attendee.comments %}<li>Comentários: {{ attendee.comments }}</li>{% endif %}
+</ul>
+
+<p>Veja todos os convidados no seu painel.</p>
+""")
+
+_MODIFICATION_TEMPLATE = _templates.from_string("""
+<h2>RSVP Modificado</h2>
+<p><strong>{{ attendee.name }}</strong> modificou a confirmação para: <strong>{{ event.title }}</strong></p>
+
+<h3>Detalhes Atualizados:</h3>
+<ul>
+    <li>Adultos: {{ attendee.num_adults }}</li>
+    <li>Crianças: {{ attendee.num_children }}</li>
+    <li>Comentários: {{ attendee.comments }}</li>
+</ul>
+""")
+
+_CANCELLATION_TEMPLATE = _templates.from_string("""
+<h2>RSVP Cancelado</h2>
+<p><strong>{{ attendee.name }}</strong> cancelou a presença em: <strong>{{ event.title }}</strong></p>
+
+{% if reason %}<p><strong>Motivo:</strong> {{ reason }}</p>{% endif %}
+""")
+
+# Pool de threads para envio de emails fora do ciclo da requisição HTTP
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="email")
+
+
+def dispatch_notification(send_fn, event_id, attendee_id, *args):
+    """
+    Agenda o envio de uma notificação em background.
+
+    Recebe IDs (e não objetos ORM, que ficariam desanexados da sessão) e
+    recarrega evento e convidado dentro de um app context na thread do pool.
+    """
+    app = current_app._get_current_object()
+    _executor.submit(_run_notification, app, send_fn, event_id, attendee_id, *args)
+
+
+def _run_notification(app, send_fn, event_id, attendee_id, *args):
+    with app.app_context():
+        try:
+            event = db.session.get(
+                Event, event_id, options=[joinedload(Event.host)]
+            )
+            attendee = db.session.get(Attendee, attendee_id)
+            if not event or not attendee:
+                logger.error(
+                    "❌ Evento %s ou convidado %s não encontrado", event_id, attendee_id
+                )
+                return
+            send_fn(event, attendee, *args)
+        except Exception:
+            logger.exception("❌ Erro ao enviar email")
 
 
 def send_rsvp_notification(event, attendee):
@@ -20,62 +111,47 @@ def send_rsvp_notification(event, attendee):
     # ========================================================================
     # MODO SIMULAÇÃO - Para avaliadores (sem necessidade de conta SendGrid)
     # ========================================================================
-    print("=" * 80)
-    print("📧 EMAIL SIMULADO - NOVO RSVP")
-    print("=" * 80)
-    print(f"De: {os.getenv('SENDER_EMAIL', 'noreply@venha.app')}")
-    print(f"Para: {event.host.email}")
-    print(f"Assunto: Novo RSVP para {event.title}")
-    print("-" * 80)
-    print("CONTEÚDO DO EMAIL:")
-    print("-" * 80)
-    print(f"Nova Confirmação de Presença!")
-    print(f"{attendee.name} confirmou presença no seu evento: {event.title}")
-    print()
-    print("Detalhes:")
-    print(f"  - Adultos: {attendee.num_adults}")
-    print(f"  - Crianças: {attendee.num_children}")
-    print(f"  - WhatsApp: {attendee.whatsapp_number}")
+    lines = [
+        "=" * 80,
+        "📧 EMAIL SIMULADO - NOVO RSVP",
+        "=" * 80,
+        f"De: {SENDER_EMAIL}",
+        f"Para: {event.host.email}",
+        f"Assunto: Novo RSVP para {event.title}",
+        "-" * 80,
+        "CONTEÚDO DO EMAIL:",
+        "-" * 80,
+        "Nova Confirmação de Presença!",
+        f"{attendee.name} confirmou presença no seu evento: {event.title}",
+        "",
+        "Detalhes:",
+        f"  - Adultos: {attendee.num_adults}",
+        f"  - Crianças: {attendee.num_children}",
+        f"  - WhatsApp: {attendee.whatsapp_number}",
+    ]
     if attendee.comments:
-        print(f"  - Comentários: {attendee.comments}")
-    print()
-    print("Veja todos os convidados no seu painel.")
-    print("=" * 80)
+        lines.append(f"  - Comentários: {attendee.comments}")
+    lines += ["", "Veja todos os convidados no seu painel.", "=" * 80]
+    logger.info("\n%s", "\n".join(lines))
     return True
 
     # ========================================================================
     # CÓDIGO SENDGRID ORIGINAL - Comentado para avaliação
     # Para produção: Descomente este bloco e comente o bloco de simulação acima
     # ========================================================================
-    # sender_email = os.getenv("SENDER_EMAIL")
-    #
     # message = Mail(
-    #     from_email=sender_email,
+    #     from_email=SENDER_EMAIL,
     #     to_emails=event.host.email,
     #     subject=f"Novo RSVP para {event.title}",
-    #     html_content=f"""
-    #         <h2>Nova Confirmação de Presença!</h2>
-    #         <p><strong>{attendee.name}</strong> confirmou presença no seu evento: <strong>{event.title}</strong></p>
-    #
-    #         <h3>Detalhes:</h3>
-    #         <ul>
-    #             <li>Adultos: {attendee.num_adults}</li>
-    #             <li>Crianças: {attendee.num_children}</li>
-    #             <li>WhatsApp: {attendee.whatsapp_number}</li>
-    #             {f'<li>Comentários: {attendee.comments}</li>' if attendee.comments else ''}
-    #         </ul>
-    #
-    #         <p>Veja todos os convidados no seu painel.</p>
-    #     """,
+    #     html_content=_RSVP_TEMPLATE.render(event=event, attendee=attendee),
     # )
     #
     # try:
-    #     sg = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
-    #     response = sg.send(message)
-    #     print(f"✅ Email enviado! Status: {response.status_code}")
+    #     response = _SG.send(message)
+    #     logger.info("✅ Email enviado! Status: %s", response.status_code)
     #     return True
-    # except Exception as e:
-    #     print(f"❌ Erro ao enviar email: {e}")
+    # except Exception:
+    #     logger.exception("❌ Erro ao enviar email")
     #     return False
 
 
@@ -85,54 +161,44 @@ def send_modification_notification(event, attendee):
     # ========================================================================
     # MODO SIMULAÇÃO - Para avaliadores
     # ========================================================================
-    print("=" * 80)
-    print("📧 EMAIL SIMULADO - RSVP MODIFICADO")
-    print("=" * 80)
-    print(f"De: {os.getenv('SENDER_EMAIL', 'noreply@venha.app')}")
-    print(f"Para: {event.host.email}")
-    print(f"Assunto: RSVP Modificado - {event.title}")
-    print("-" * 80)
-    print("CONTEÚDO DO EMAIL:")
-    print("-" * 80)
-    print(f"RSVP Modificado")
-    print(f"{attendee.name} modificou a confirmação para: {event.title}")
-    print()
-    print("Detalhes Atualizados:")
-    print(f"  - Adultos: {attendee.num_adults}")
-    print(f"  - Crianças: {attendee.num_children}")
-    print(f"  - Comentários: {attendee.comments or 'Nenhum'}")
-    print("=" * 80)
+    lines = [
+        "=" * 80,
+        "📧 EMAIL SIMULADO - RSVP MODIFICADO",
+        "=" * 80,
+        f"De: {SENDER_EMAIL}",
+        f"Para: {event.host.email}",
+        f"Assunto: RSVP Modificado - {event.title}",
+        "-" * 80,
+        "CONTEÚDO DO EMAIL:",
+        "-" * 80,
+        "RSVP Modificado",
+        f"{attendee.name} modificou a confirmação para: {event.title}",
+        "",
+        "Detalhes Atualizados:",
+        f"  - Adultos: {attendee.num_adults}",
+        f"  - Crianças: {attendee.num_children}",
+        f"  - Comentários: {attendee.comments or 'Nenhum'}",
+        "=" * 80,
+    ]
+    logger.info("\n%s", "\n".join(lines))
     return True
 
     # ========================================================================
     # CÓDIGO SENDGRID ORIGINAL - Comentado para avaliação
     # ========================================================================
-    # sender_email = os.getenv("SENDER_EMAIL")
-    #
     # message = Mail(
-    #     from_email=sender_email,
+    #     from_email=SENDER_EMAIL,
     #     to_emails=event.host.email,
     #     subject=f"RSVP Modificado - {event.title}",
-    #     html_content=f"""
-    #         <h2>RSVP Modificado</h2>
-    #         <p><strong>{attendee.name}</strong> modificou a confirmação para: <strong>{event.title}</strong></p>
-    #
-    #         <h3>Detalhes Atualizados:</h3>
-    #         <ul>
-    #             <li>Adultos: {attendee.num_adults}</li>
-    #             <li>Crianças: {attendee.num_children}</li>
-    #             <li>Comentários: {attendee.comments}</li>
-    #         </ul>
-    #     """,
+    #     html_content=_MODIFICATION_TEMPLATE.render(event=event, attendee=attendee),
     # )
     #
     # try:
-    #     sg = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
-    #     sg.send(message)
-    #     print("✅ Email de modificação enviado!")
+    #     _SG.send(message)
+    #     logger.info("✅ Email de modificação enviado!")
     #     return True
-    # except Exception as e:
-    #     print(f"❌ Erro ao enviar email: {e}")
+    # except Exception:
+    #     logger.exception("❌ Erro ao enviar email")
     #     return False
 
 
@@ -142,47 +208,43 @@ def send_cancellation_notification(event, attendee, reason=""):
     # ========================================================================
     # MODO SIMULAÇÃO - Para avaliadores
     # ========================================================================
-    print("=" * 80)
-    print("📧 EMAIL SIMULADO - RSVP CANCELADO")
-    print("=" * 80)
-    print(f"De: {os.getenv('SENDER_EMAIL', 'noreply@venha.app')}")
-    print(f"Para: {event.host.email}")
-    print(f"Assunto: RSVP Cancelado - {event.title}")
-    print("-" * 80)
-    print("CONTEÚDO DO EMAIL:")
-    print("-" * 80)
-    print(f"RSVP Cancelado")
-    print(f"{attendee.name} cancelou a presença em: {event.title}")
+    lines = [
+        "=" * 80,
+        "📧 EMAIL SIMULADO - RSVP CANCELADO",
+        "=" * 80,
+        f"De: {SENDER_EMAIL}",
+        f"Para: {event.host.email}",
+        f"Assunto: RSVP Cancelado - {event.title}",
+        "-" * 80,
+        "CONTEÚDO DO EMAIL:",
+        "-" * 80,
+        "RSVP Cancelado",
+        f"{attendee.name} cancelou a presença em: {event.title}",
+    ]
     if reason:
-        print()
-        print(f"Motivo: {reason}")
-    print("=" * 80)
+        lines += ["", f"Motivo: {reason}"]
+    lines.append("=" * 80)
+    logger.info("\n%s", "\n".join(lines))
     return True
 
     # ========================================================================
     # CÓDIGO SENDGRID ORIGINAL - Comentado para avaliação
     # ========================================================================
-    # sender_email = os.getenv("SENDER_EMAIL")
-    #
     # message = Mail(
-    #     from_email=sender_email,
+    #     from_email=SENDER_EMAIL,
     #     to_emails=event.host.email,
     #     subject=f"RSVP Cancelado - {event.title}",
-    #     html_content=f"""
-    #         <h2>RSVP Cancelado</h2>
-    #         <p><strong>{attendee.name}</strong> cancelou a presença em: <strong>{event.title}</strong></p>
-    #
-    #         {f'<p><strong>Motivo:</strong> {reason}</p>' if reason else ''}
-    #     """,
+    #     html_content=_CANCELLATION_TEMPLATE.render(
+    #         event=event, attendee=attendee, reason=reason
+    #     ),
     # )
     #
     # try:
-    #     sg = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
-    #     sg.send(message)
-    #     print("✅ Email de cancelamento enviado!")
+    #     _SG.send(message)
+    #     logger.info("✅ Email de cancelamento enviado!")
     #     return True
-    # except Exception as e:
-    #     print(f"❌ Erro ao enviar email: {e}")
+    # except Exception:
+    #     logger.exception("❌ Erro ao enviar email")
     #     return False
 
 
@@ -192,9 +254,10 @@ def send_cancellation_notification(event, attendee, reason=""):
 """
 Para habilitar envio de emails real via SendGrid em produção:
 
-1. Descomente os imports no início do arquivo:
+1. Descomente os imports e o cliente no início do arquivo:
    - from sendgrid import SendGridAPIClient
    - from sendgrid.helpers.mail import Mail
+   - SENDGRID_API_KEY (com a verificação) e _SG = SendGridAPIClient(...)
 
 2. Em cada função (send_rsvp_notification, send_modification_notification,
    send_cancellation_notification):
@@ -1,8 +1,56 @@
 # backend/services/geocoding_service.py
 """Serviço de geocodificação de endereços usando Google Geocoding API."""
+import hashlib
+import logging
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
 import requests
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db
+from models import GeocodeCache
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_GEOCODING_API_KEY = os.getenv("GOOGLE_GEOCODING_API_KEY")
+_GOOGLE_ENABLED = GOOGLE_GEOCODING_API_KEY not in (None, "", "SUA_CHAVE_AQUI")
+if not _GOOGLE_ENABLED:
+    logger.warning(
+        "⚠️  Google API key não configurada, geocodificação usará apenas Nominatim"
+    )
+
+# Sessão compartilhada: reaproveita conexões keep-alive (TCP/TLS) entre chamadas
+_SESSION = requests.Session()
+
+# Se o Google não responder neste prazo, o Nominatim é consultado em paralelo
+_FALLBACK_DELAY = 0.5  # segundos
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="geocode")
+
+# Política de uso do Nominatim: no máximo 1 requisição por segundo
+_NOMINATIM_MIN_INTERVAL = 1.0  # segundos
+_nominatim_lock = threading.Lock()
+_nominatim_next_at = 0.0
+
+# Cache em memória (LRU) na frente da tabela geocode_cache
+_MEMORY_CACHE_SIZE = 4096
+_memory_cache = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+# Padrões usados para simplificar endereços antes de consultar o Nominatim
+_STREET_RE = re.compile(
+    r'^(?:Rua|Av\.|Avenida|Travessa|Alameda|Praça)\s+([^,]+)', re.IGNORECASE
+)
+_NUMBER_RE = re.compile(r',\s*(\d+)')
+_CITY_STATE_RE = re.compile(r',\s*([^,]+)\s*-\s*([A-Z]{2})')
 
 
 def geocode_address(address_full):
@@ -17,38 +65,129 @@ def geocode_address(address_full):
     if not address_full:
         return None, None
 
-    # Tentar Google Geocoding primeiro
-    lat, lon = _geocode_with_google(address_full)
+    address_hash = _address_hash(address_full)
+    cached = _get_cached(address_hash)
+    if cached:
+        return cached
+
+    lat, lon = _geocode_with_fallback(address_full)
 
+    # Apenas resultados encontrados são guardados, para que falhas
+    # temporárias das APIs não fiquem cacheadas
     if lat and lon:
-        return lat, lon
+        _store_cached(address_hash, lat, lon)
+
+    return lat, lon
+
+
+def _geocode_with_fallback(address_full):
+    """
+    Tenta o Google primeiro. Se ele falhar, usa o Nominatim; se demorar mais
+    que _FALLBACK_DELAY, dispara o Nominatim em paralelo e fica com a
+    primeira resposta válida.
+    """
+    google = _executor.submit(_geocode_with_google, address_full)
+    done, _ = wait([google], timeout=_FALLBACK_DELAY)
+
+    if done:
+        lat, lon = google.result()
+        if lat and lon:
+            return lat, lon
+        # Fallback para Nominatim se Google falhar
+        logger.warning("⚠️  Google Geocoding falhou, tentando Nominatim...")
+        return _geocode_with_nominatim(address_full)
+
+    logger.warning("⚠️  Google Geocoding lento, consultando Nominatim em paralelo...")
+    pending = {google, _executor.submit(_geocode_with_nominatim, address_full)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            lat, lon = future.result()
+            if lat and lon:
+                return lat, lon
+
+    return None, None
+
+
+def _address_hash(address_full):
+    """
+    Chave do cache: endereço normalizado (minúsculas, sem pontuação,
+    espaços colapsados) reduzido com BLAKE2b de 16 bytes.
+    """
+    normalized = " ".join(_PUNCTUATION_RE.sub(" ", address_full.lower()).split())
+    return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+
+def _get_cached(address_hash):
+    """Busca coordenadas no cache em memória e depois na tabela geocode_cache."""
+    with _memory_cache_lock:
+        if address_hash in _memory_cache:
+            _memory_cache.move_to_end(address_hash)
+            return _memory_cache[address_hash]
+
+    # Conexão própria para não interferir na transação da sessão da requisição
+    try:
+        with db.engine.connect() as conn:
+            row = conn.execute(
+                select(GeocodeCache.latitude, GeocodeCache.longitude).where(
+                    GeocodeCache.address_hash == address_hash
+                )
+            ).first()
+    except SQLAlchemyError as e:
+        logger.warning("⚠️  Erro ao ler cache de geocodificação: %s", e)
+        return None
+
+    if not row:
+        return None
+
+    coords = (row.latitude, row.longitude)
+    _remember(address_hash, coords)
+    return coords
+
+
+def _store_cached(address_hash, lat, lon):
+    _remember(address_hash, (lat, lon))
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(
+                insert(GeocodeCache).values(
+                    address_hash=address_hash,
+                    latitude=lat,
+                    longitude=lon,
+                    fetched_at=datetime.utcnow(),
+                )
+            )
+    except SQLAlchemyError as e:
+        # Ex.: outra requisição já gravou o mesmo endereço
+        logger.warning("⚠️  Erro ao gravar cache de geocodificação: %s", e)
+
 
-    # Fallback para Nominatim se Google falhar
-    print("⚠️  Google Geocoding falhou, tentando Nominatim...")
-    return _geocode_with_nominatim(address_full)
+def _remember(address_hash, coords):
+    with _memory_cache_lock:
+        _memory_cache[address_hash] = coords
+        _memory_cache.move_to_end(address_hash)
+        if len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
 
 
 def _geocode_with_google(address_full):
     """
     Geocodifica usando Google Geocoding API.
     """
-    api_key = os.getenv("GOOGLE_GEOCODING_API_KEY")
-
-    if not api_key or api_key == "SUA_CHAVE_AQUI":
-        print("⚠️  Google API key não configurada, usando Nominatim")
+    if not _GOOGLE_ENABLED:
         return None, None
 
     try:
-        print(f"📍 Geocodificando com Google: {address_full[:60]}...")
+        logger.info("📍 Geocodificando com Google: %s...", address_full[:60])
 
         url = "https://maps.googleapis.com/maps/api/geocode/json"
         params = {
             "address": address_full,
             "region": "br",  # Prioriza resultados do Brasil
-            "key": api_key
+            "key": GOOGLE_GEOCODING_API_KEY
         }
 
-        response = requests.get(url, params=params, timeout=5)
+        response = _SESSION.get(url, params=params, timeout=5)
         response.raise_for_status()
         data = response.json()
 
@@ -60,94 +199,128 @@ def _geocode_with_google(address_full):
 
             if lat and lon and -90 <= lat <= 90 and -180 <= lon <= 180:
                 formatted_address = result.get("formatted_address", "")
-                print(f"   ✅ Google sucesso! Lat={lat}, Lon={lon}")
-                print(f"   Endereço formatado: {formatted_address}")
+                logger.info("   ✅ Google sucesso! Lat=%s, Lon=%s", lat, lon)
+                logger.info("   Endereço formatado: %s", formatted_address)
                 return lat, lon
 
         status = data.get("status", "UNKNOWN")
-        print(f"   ❌ Google não encontrou: {status}")
+        logger.warning("   ❌ Google não encontrou: %s", status)
         return None, None
 
     except requests.RequestException as e:
-        print(f"❌ Erro na requisição Google: {e}")
+        logger.error("❌ Erro na requisição Google: %s", e)
         return None, None
     except (ValueError, KeyError) as e:
-        print(f"❌ Erro ao processar resposta Google: {e}")
+        logger.error("❌ Erro ao processar resposta Google: %s", e)
         return None, None
 
 
 def _geocode_with_nominatim(address_full):
     """
     Geocodifica usando Nominatim (OpenStreetMap) como fallback.
+
+    Tenta primeiro o endereço original; só simplifica o endereço (rua,
+    número, cidade e estado) se o Nominatim não encontrar nada.
     """
     try:
-        # Simplificar endereço para Nominatim
-        street_match = re.match(
-            r'^(?:Rua|Av\.|Avenida|Travessa|Alameda|Praça)\s+([^,]+)',
-            address_full,
-            re.IGNORECASE
-        )
-        if street_match:
-            street_name = street_match.group(1).strip()
-        else:
-            street_name = address_full.split(',')[0].strip()
-
-        number_match = re.search(r',\s*(\d+)', address_full)
-        number = number_match.group(1) if number_match else None
-
-        city_state_match = re.search(r',\s*([^,]+)\s*-\s*([A-Z]{2})', address_full)
-        if city_state_match:
-            city = city_state_match.group(1).strip()
-            state = city_state_match.group(2).strip()
-        else:
-            city = None
-            state = None
-
-        if not (street_name and city):
-            print("❌ Não foi possível extrair rua ou cidade do endereço")
+        lat, lon = _search_nominatim(address_full)
+        if lat and lon:
+            return lat, lon
+
+        simplified_address = _simplify_address(address_full)
+        if not simplified_address:
+            logger.warning("❌ Não foi possível extrair rua ou cidade do endereço")
+            return None, None
+        if simplified_address == address_full:
             return None, None
 
-        # Montar endereço simplificado
-        if number:
-            if state:
-                simplified_address = f"{street_name}, {number}, {city}, {state}, Brasil"
-            else:
-                simplified_address = f"{street_name}, {number}, {city}, Brasil"
-        else:
-            if state:
-                simplified_address = f"{street_name}, {city}, {state}, Brasil"
-            else:
-                simplified_address = f"{street_name}, {city}, Brasil"
-
-        print(f"📍 Geocodificando com Nominatim: {simplified_address}")
-
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            "q": simplified_address,
-            "format": "json",
-            "limit": 1,
-            "addressdetails": 1,
-        }
-        headers = {
-            "User-Agent": "VenhaApp/1.0"
-        }
+        return _search_nominatim(simplified_address)
 
-        response = requests.get(url, params=params, headers=headers, timeout=3)
-        response.raise_for_status()
-        data = response.json()
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logger.error("❌ Erro ao geocodificar com Nominatim: %s", e)
+        return None, None
 
-        if data and len(data) > 0:
-            result = data[0]
-            lat = float(result.get("lat"))
-            lon = float(result.get("lon"))
 
-            if lat and lon and -90 <= lat <= 90 and -180 <= lon <= 180:
-                print(f"   ✅ Nominatim sucesso! Lat={lat}, Lon={lon}")
-                return lat, lon
+def _simplify_address(address_full):
+    """
+    Reduz o endereço a "Rua, Número, Cidade, Estado, Brasil".
 
-        print("   ❌ Nominatim não encontrou coordenadas")
-        return None, None
+    Retorna None se não for possível extrair rua e cidade.
+    """
+    street_match = _STREET_RE.match(address_full)
+    if street_match:
+        street_name = street_match.group(1).strip()
+    else:
+        street_name = address_full.split(',')[0].strip()
 
-    except (requests.RequestException, ValueError, KeyError) as e:
-        print(f"❌ Erro ao geocodificar com Nominatim: {e}")
-        return None, None
+    number_match = _NUMBER_RE.search(address_full)
+    number = number_match.group(1) if number_match else None
+
+    city_state_match = _CITY_STATE_RE.search(address_full)
+    if city_state_match:
+        city = city_state_match.group(1).strip()
+        state = city_state_match.group(2).strip()
+    else:
+        city = None
+        state = None
+
+    if not (street_name and city):
+        return None
+
+    # Montar endereço simplificado
+    if number:
+        if state:
+            return f"{street_name}, {number}, {city}, {state}, Brasil"
+        return f"{street_name}, {number}, {city}, Brasil"
+    if state:
+        return f"{street_name}, {city}, {state}, Brasil"
+    return f"{street_name}, {city}, Brasil"
+
+
+def _wait_nominatim_slot():
+    """
+    Espaça as chamadas ao Nominatim em _NOMINATIM_MIN_INTERVAL.
+
+    Cada chamada reserva o próximo horário livre e espera até ele, inclusive
+    a segunda busca (endereço simplificado) e as consultas paralelas ao Google.
+    O controle é por processo.
+    """
+    global _nominatim_next_at
+    with _nominatim_lock:
+        now = time.monotonic()
+        delay = _nominatim_next_at - now
+        _nominatim_next_at = max(now, _nominatim_next_at) + _NOMINATIM_MIN_INTERVAL
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _search_nominatim(query):
+    _wait_nominatim_slot()
+    logger.info("📍 Geocodificando com Nominatim: %s", query)
+
+    url = "https://nominatim.openstreetmap.org/search"
+    params = {
+        "q": query,
+        "format": "json",
+        "limit": 1,
+        "addressdetails": 1,
+    }
+    headers = {
+        "User-Agent": "VenhaApp/1.0"
+    }
+
+    response = _SESSION.get(url, params=params, headers=headers, timeout=3)
+    response.raise_for_status()
+    data = response.json()
+
+    if data and len(data) > 0:
+        result = data[0]
+        lat = float(result.get("lat"))
+        lon = float(result.get("lon"))
+
+        if lat and lon and -90 <= lat <= 90 and -180 <= lon <= 180:
+            logger.info("   ✅ Nominatim sucesso! Lat=%s, Lon=%s", lat, lon)
+            return lat, lon
+
+    logger.warning("   ❌ Nominatim não encontrou coordenadas")
+    return None, None
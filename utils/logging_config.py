@@ -0,0 +1,60 @@
+# backend/utils/logging_config.py
+"""
+Configuração de logs da aplicação.
+
+As threads de requisição apenas enfileiram os registros (QueueHandler); uma
+thread em background (QueueListener) faz a escrita no stdout e, se LOG_FILE
+estiver definido, também no arquivo.
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener = None
+_listener_pid = None
+
+
+def setup_logging():
+    """
+    Configura o logger raiz para escrever via fila.
+
+    Pode ser chamada novamente após um fork (ex.: workers do Gunicorn com
+    preload_app): a thread do listener não sobrevive ao fork, então cada
+    processo cria a sua.
+    """
+    global _listener, _listener_pid
+
+    if _listener_pid == os.getpid():
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    if _listener_pid is None:
+        atexit.register(_stop_listener)
+    _listener = listener
+    _listener_pid = os.getpid()
+
+
+def _stop_listener():
+    # Escreve os registros que ainda estiverem na fila antes de encerrar
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()